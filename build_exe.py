@@ -1,15 +1,51 @@
 import argparse
+import hashlib
 import os
 import shutil
 import sys
 
 
+BUILD_HASH_PATH = os.path.join('build', '.buildhash')
+
+
+def source_digest():
+    """Hash the build inputs that should invalidate PyInstaller's cache."""
+    paths = ['build_exe.py', 'version_info_template.py']
+    for root, dirs, files in os.walk('duckhunt_win'):
+        if '__pycache__' in dirs:
+            dirs.remove('__pycache__')
+        for name in files:
+            paths.append(os.path.join(root, name))
+
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(path.encode('utf-8'))
+        try:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            continue
+    return digest.hexdigest()
+
 
 def build():
-    parser = argparse.ArgumentParser(description="Build DuckHunt executable")
+    parser = argparse.ArgumentParser(
+        description="Build DuckHunt executable",
+        epilog="The build is one-dir: dist/<name>/ holds the exe plus support files "
+               "and is zipped for distribution. Unlike a one-file exe, this starts "
+               "without self-extracting the bundle to a temp dir on every launch.",
+    )
     parser.add_argument("--ci", action="store_true", help="CI Mode: Clean output but keep build cache")
     parser.add_argument("--no-clean", action="store_true", help="Do not clean build artifacts")
+    parser.add_argument("--full-clean", action="store_true", help="Discard the build cache even if inputs are unchanged")
     parser.add_argument("--name", default="duckhunt", help="Name of the output executable")
+    parser.add_argument(
+        "--onefile",
+        action="store_true",
+        help="Build a single-file executable instead of the default one-dir "
+             "bundle. Extraction goes to %%LOCALAPPDATA%%\\duckhunt instead of "
+             "a fresh temp dir so launches reuse a persistent location.",
+    )
     
     args = parser.parse_args()
 
@@ -18,26 +54,41 @@ def build():
         sys.exit(1)
 
     # Cleaning Logic
-    should_clean_dist = True
-    should_clean_build = True
+    # dist/ (output) is always rebuilt. build/ holds PyInstaller's analysis
+    # cache, which dominates build time, so it is only discarded when the
+    # build inputs actually changed (tracked via a content digest) or on an
+    # explicit --full-clean (e.g. for CI release cuts).
+    should_clean_dist = not args.no_clean
 
+    input_digest = source_digest()
     if args.no_clean:
-        should_clean_dist = False
         should_clean_build = False
+    elif args.full_clean:
+        should_clean_build = True
     elif args.ci:
-        should_clean_dist = True
+        # CI restores build/ from its cache step; trust it and let
+        # PyInstaller's own dependency tracking handle incremental changes
         should_clean_build = False
-    
+    else:
+        try:
+            with open(BUILD_HASH_PATH, "r", encoding="utf-8") as f:
+                should_clean_build = f.read().strip() != input_digest
+        except OSError:
+            should_clean_build = True
+
+    # One directory scan instead of a stat syscall per existence check
+    cwd_entries = {e.name for e in os.scandir('.')}
+
     if should_clean_dist:
          print("Cleaning dist (output)...")
-         if os.path.exists('dist'):
+         if 'dist' in cwd_entries:
              shutil.rmtree('dist')
-    
+
     if should_clean_build:
          print("Cleaning build (cache)...")
-         if os.path.exists('build'):
+         if 'build' in cwd_entries:
              shutil.rmtree('build')
-    
+
     # extract version from source
     # We add the current directory to sys.path to ensure we can import the local module
     # even if it's not installed.
@@ -60,36 +111,48 @@ def build():
 
     output_name = f"{args.name}_v{version}"
 
-    # Generate version_info.txt
-    template_path = "version_info.template"
-    if not os.path.exists(template_path):
-         print(f"Error: Template not found at {template_path}")
-         sys.exit(1)
-
-    with open(template_path, "r", encoding="utf-8") as f:
-        template_content = f.read()
-        version_info_content = template_content.format(
-            file_version_tuple=v_tuple,
-            file_version_str=version
-        )
+    # Generate version_info.txt (template is a Python module, no .format parse)
+    from version_info_template import render
+    version_info_content = render(v_tuple, version)
 
     version_file_path = "version_info.txt"
-    with open(version_file_path, "w", encoding="utf-8") as f:
-        f.write(version_info_content)
+    with open(version_file_path, "wb") as f:
+        f.write(version_info_content.encode("utf-8"))
     
+    # Recent pefile releases made PyInstaller's binary dependency scan take
+    # tens of minutes on Windows; warn when the pinned fast version isn't used.
+    fast_pefile = "2023.2.7"
+    try:
+        import pefile
+        if pefile.__version__ != fast_pefile:
+            print(f"Warning: pefile {pefile.__version__} installed; builds are "
+                  f"much faster with the pinned pefile=={fast_pefile}.")
+    except ImportError:
+        pass
+
     print(f"Building {output_name} for Windows...")
     
     pyinstaller_args = [
         'duckhunt_win/__main__.py',
         f'--name={output_name}',
         '--noconsole',
-        '--onefile',
         '--icon=duckhunt_win/resources/favicon.ico',
         f'--add-data=duckhunt_win/resources;duckhunt_win/resources',
         '--version-file=version_info.txt',
         '--noconfirm',
     ]
 
+    if args.onefile:
+        # The bootloader expands environment variables here (Windows), so the
+        # extraction dir is stable and user-writable rather than a fresh temp
+        # dir picked on every launch.
+        pyinstaller_args.append('--onefile')
+        pyinstaller_args.append(r'--runtime-tmpdir=%LOCALAPPDATA%\duckhunt')
+    else:
+        # One-dir build: launching does not re-extract the whole bundle to a
+        # temp dir like --onefile does, which matters for a run-at-login app.
+        pyinstaller_args.append('--onedir')
+
     if should_clean_build:
         pyinstaller_args.append('--clean')
     
@@ -98,8 +161,21 @@ def build():
         PyInstaller.__main__.run(pyinstaller_args)
     finally:
         # Cleanup generated version info file
-        if os.path.exists(version_file_path):
+        try:
             os.remove(version_file_path)
+        except FileNotFoundError:
+            pass
+
+    # Record what the cache was built from so the next run can skip cleaning
+    os.makedirs('build', exist_ok=True)
+    with open(BUILD_HASH_PATH, "w", encoding="utf-8") as f:
+        f.write(input_digest)
+
+    # Zip the one-dir output for distribution
+    app_dir = os.path.join('dist', output_name)
+    if os.path.isdir(app_dir):
+        print(f"Zipping {app_dir}...")
+        shutil.make_archive(app_dir, 'zip', root_dir='dist', base_dir=output_name)
 
     print("Build complete.")
 
@@ -4,11 +4,6 @@
 from __future__ import annotations
 
 import sys
-import ctypes
-from multiprocessing.connection import Client
-
-from duckhunt_win.controller import DuckHuntController
-from duckhunt_win.ipc import get_window_ipc_address
 
 def main() -> int:
     """Run the DuckHunt tray application."""
@@ -38,28 +33,28 @@ def main() -> int:
         wd.run()
         return 0
 
-    # Single Instance Check
-    try:
-        address = get_window_ipc_address()
-        # access_token=None because we set authkey=None in the server
-        with Client(address, authkey=None) as conn:
-            # Just connect to check existence
-            pass
-        
-        # If we reached here, another instance accepted our connection.
+    # GUI mode: only now pull in the heavy imports (tkinter, IPC machinery).
+    # Daemon/watchdog dispatch above must not pay for them.
+    import ctypes
+
+    from duckhunt_win.utils import acquire_single_instance_mutex
+
+    # Single Instance Check (one CreateMutexW syscall; the OS releases the
+    # mutex automatically if the holder dies)
+    instance_mutex = acquire_single_instance_mutex()
+    if instance_mutex is None:
         print("DuckHunt is already running.")
-        
+
         # Warn user
         ctypes.windll.user32.MessageBoxW(
-            0, 
-            "DuckHunt is already running.", 
-            "DuckHunt Already Running", 
+            0,
+            "DuckHunt is already running.",
+            "DuckHunt Already Running",
             0x30 | 0x0  # MB_ICONWARNING | MB_OK
         )
         return 0
-    except (OSError, ValueError):
-        # ValueError/OSError implies connection failed => instance not likely running
-        pass
+
+    from duckhunt_win.controller import DuckHuntController
 
     try:
         app = DuckHuntController(auth_key_hex=args.auth_key, watchdog_pid=args.watchdog_pid)
@@ -2,11 +2,92 @@
 
 from __future__ import annotations
 
+import ast
+import json
+import os
 import tomllib
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from typing import Self
 
+# Cache key identifying the parsed file: (path, mtime_ns, size)
+_CacheKey = tuple[str, int, int]
+
+
+def _cache_path() -> Path:
+    base = os.environ.get("LOCALAPPDATA")
+    root = Path(base) if base else Path.home()
+    return root / "duckhunt" / "config.cache"
+
+
+def _read_cached_config(key: _CacheKey) -> "Config | None":
+    # JSON on purpose: the cache lives in a user-writable directory, and
+    # Config is seven scalar fields — unpickling a plantable file would
+    # hand arbitrary code execution to anything that can write it
+    try:
+        data = json.loads(_cache_path().read_text(encoding="utf-8"))
+        if tuple(data["key"]) != key:
+            return None
+        return Config(**data["config"])
+    except Exception:
+        return None
+
+
+# In-process memo of parsed configs keyed by file mtime. Sharing instances
+# is safe because Config is frozen.
+_CONFIG_CACHE: dict[str, tuple[int, "Config"]] = {}
+
+
+def _memo_get(path: Path) -> "Config | None":
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return None
+    entry = _CONFIG_CACHE.get(str(path))
+    if entry is not None and entry[0] == mtime:
+        return entry[1]
+    return None
+
+
+def _memo_put(path: Path, config: "Config") -> None:
+    try:
+        _CONFIG_CACHE[str(path)] = (path.stat().st_mtime_ns, config)
+    except OSError:
+        pass
+
+
+def _write_cached_config(key: _CacheKey, config: "Config") -> None:
+    try:
+        cache = _cache_path()
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        cache.write_text(
+            json.dumps({"key": list(key), "config": asdict(config)}),
+            encoding="utf-8",
+        )
+    except Exception:
+        pass
+
+
+def _parse_legacy_assignments(source: str) -> dict[str, object]:
+    """Extract simple ``name = literal`` assignments from a legacy conf file.
+
+    The legacy duckhunt.conf is a Python file, but only flat assignments of
+    literals are meaningful, so there is no need to exec() arbitrary code
+    from a user-writable file just to read them.
+    """
+    values: dict[str, object] = {}
+    for node in ast.parse(source).body:
+        if not isinstance(node, ast.Assign) or len(node.targets) != 1:
+            continue
+        target = node.targets[0]
+        if not isinstance(target, ast.Name):
+            continue
+        try:
+            values[target.id] = ast.literal_eval(node.value)
+        except ValueError:
+            continue
+    return values
+
 
 @dataclass(frozen=True, slots=True)
 class Config:
@@ -32,9 +113,12 @@ class Config:
     @classmethod
     def from_legacy_conf(cls, path: Path) -> Self:
         """Load configuration from legacy duckhunt.conf Python file."""
-        config_globals: dict[str, object] = {}
+        cached = _memo_get(path)
+        if cached is not None:
+            return cached
+
         try:
-            exec(path.read_text(encoding="utf-8"), config_globals)  # noqa: S102
+            config_globals = _parse_legacy_assignments(path.read_text(encoding="utf-8"))
         except Exception:
             return cls()
 
@@ -49,7 +133,7 @@ class Config:
         burst_keys = 10
         burst_window_ms = 100
 
-        return cls(
+        config = cls(
             threshold=threshold,
             history_size=history_size,
             burst_keys=burst_keys,
@@ -58,18 +142,24 @@ class Config:
             run_on_startup=bool(config_globals.get("run_on_startup", True)),
             watchdog_enabled=bool(config_globals.get("watchdog_enabled", True)),
         )
+        _memo_put(path, config)
+        return config
 
     @classmethod
     def from_toml(cls, path: Path) -> Self:
         """Load configuration from TOML file."""
+        cached = _memo_get(path)
+        if cached is not None:
+            return cached
+
         try:
             data = tomllib.loads(path.read_text(encoding="utf-8"))
         except Exception:
             return cls()
-            
+
         duckhunt = data.get("duckhunt", {})
 
-        return cls(
+        config = cls(
             threshold=duckhunt.get("threshold", 30),
             history_size=duckhunt.get("history_size", 25),
             burst_keys=duckhunt.get("burst_keys", 10),
@@ -78,6 +168,8 @@ class Config:
             run_on_startup=duckhunt.get("run_on_startup", True),
             watchdog_enabled=duckhunt.get("watchdog_enabled", True),
         )
+        _memo_put(path, config)
+        return config
 
     @classmethod
     def load(cls, config_path: Path | None = None) -> Self:
@@ -88,28 +180,49 @@ class Config:
         2. duckhunt.conf in CWD
         3. duckhunt.conf in User Home
         4. Embedded default
+
+        Parsed results are cached on disk keyed by (path, mtime, size) so
+        warm starts skip the TOML/legacy parsing entirely.
         """
+        path: Path | None = None
         if config_path is not None and config_path.exists():
-            if config_path.suffix == ".toml":
-                return cls.from_toml(config_path)
-            return cls.from_legacy_conf(config_path)
+            path = config_path
+        else:
+            # Search paths
+            cwd = Path.cwd()
+            home = Path.home()
+
+            for candidate in (
+                cwd / "duckhunt.toml",
+                cwd / "duckhunt.conf",
+                home / "duckhunt.conf",
+            ):
+                if candidate.exists():
+                    path = candidate
+                    break
+
+        if path is None:
+            # Return defaults (embedded loading logic simplified to defaults for now
+            # as class params match the default conf)
+            return cls()
 
-        # Search paths
-        cwd = Path.cwd()
-        home = Path.home()
-        
-        paths = [
-            cwd / "duckhunt.toml",
-            cwd / "duckhunt.conf",
-            home / "duckhunt.conf",
-        ]
-        
-        for path in paths:
-            if path.exists():
-                if path.suffix == ".toml":
-                    return cls.from_toml(path)
-                return cls.from_legacy_conf(path)
-
-        # Return defaults (embedded loading logic simplified to defaults for now 
-        # as class params match the default conf)
-        return cls()
+        key: _CacheKey | None
+        try:
+            st = path.stat()
+            key = (str(path), st.st_mtime_ns, st.st_size)
+        except OSError:
+            key = None
+
+        if key is not None:
+            cached = _read_cached_config(key)
+            if cached is not None:
+                return cached
+
+        if path.suffix == ".toml":
+            config = cls.from_toml(path)
+        else:
+            config = cls.from_legacy_conf(path)
+
+        if key is not None:
+            _write_cached_config(key, config)
+        return config
@@ -5,21 +5,27 @@ Orchestrates View, IPC, Daemon, and Session Monitoring.
 
 from __future__ import annotations
 
+import collections
 import ctypes
+from ctypes import wintypes
 import os
-import queue
 import secrets
 import subprocess
 import sys
 import threading
+import time
 import tkinter as tk
-import winreg
 from multiprocessing.connection import Listener
-from pathlib import Path
 from typing import Any
 
 from duckhunt_win.config import Config
 from duckhunt_win.core.session_monitor import SessionMonitor
+from duckhunt_win.utils import (
+    SYNCHRONIZE,
+    create_process,
+    is_pid_running,
+    terminate_pid,
+)
 from duckhunt_win.gui.settings import SettingsWindow
 from duckhunt_win.gui.tray import DuckHuntTrayIcon
 from duckhunt_win.ipc import (
@@ -30,11 +36,23 @@ from duckhunt_win.ipc import (
     MSG_STOP,
     MSG_DETECTED,
     IPCMessage,
+    decode_message,
+    encode_message,
     get_ipc_address,
-    get_window_ipc_address,
 )
 
 
+# Registry subkey for run-on-startup entries (a registry path, not a
+# filesystem path — keep it a plain string)
+RUN_KEY = r"Software\Microsoft\Windows\CurrentVersion\Run"
+
+# RegisterWaitForSingleObject plumbing: the kernel signals watchdog death
+# instead of us polling for it
+INFINITE = 0xFFFFFFFF
+WT_EXECUTEONLYONCE = 0x00000008
+WAITORTIMERCALLBACK = ctypes.WINFUNCTYPE(None, wintypes.LPVOID, wintypes.BOOLEAN)
+
+
 class DuckHuntController:
     """Main controller for DuckHunt application."""
 
@@ -48,19 +66,52 @@ class DuckHuntController:
         os.environ["DUCKHUNT_AUTH_KEY"] = self.auth_key.hex()
         
         self.watchdog_pid = watchdog_pid
-        self.watchdog_process: subprocess.Popen[bytes] | None = None
+        # Process handle from create_process for a watchdog we spawned
+        self._watchdog_spawn_handle: int | None = None
         
         self.listener: Listener | None = None
-        self.window_listener: Listener | None = None
         self.client_conn: Any = None
+        # Signaled when the daemon connects; lets startup wait instead of poll
+        self._client_connected = threading.Event()
+        # Serializes client_conn swaps between the accept threads
+        self._conn_lock = threading.Lock()
         self.daemon_process: subprocess.Popen[bytes] | None = None
 
+        # Child launch parameters cannot change at runtime; compute them once
+        watchdog_args = [
+            "--watchdog", "--parent-pid", str(os.getpid()),
+            "--auth-key", self.auth_key.hex(),
+        ]
+        if getattr(sys, "frozen", False):
+            # Running as compiled executable
+            self._daemon_cmd = [sys.executable, "--daemon"]
+            self._watchdog_cmd = [sys.executable, *watchdog_args]
+        else:
+            # Running as script
+            self._daemon_cmd = [sys.executable, "-m", "duckhunt_win.daemon"]
+            self._watchdog_cmd = [sys.executable, "-m", "duckhunt_win", *watchdog_args]
+        # Quoted once up front; launch_watchdog hands the string straight to
+        # CreateProcess on every relaunch
+        self._watchdog_cmdline = subprocess.list2cmdline(self._watchdog_cmd)
+        self._spawn_flags = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+
         self.config = Config.load()
         self.daemon_status = "stopped"
+        # Cached result of the HKCU Run registry probe (see check_startup)
+        self._startup_cached: bool | None = None
+        # Guards against arming the watchdog liveness timer twice
+        self._watchdog_tick_armed = False
+        # Kernel wait registration on the watchdog process handle
+        self._watchdog_wait_handle: Any = None
+        self._watchdog_proc_handle: Any = None
+        self._watchdog_wait_cb: Any = None  # keep callback thunk alive for ctypes
         
         # State managed by event logic
         self.is_locked = False
         self.incident_pending = False
+        # Toast rate limiting: suppress repeat/rapid-fire balloons
+        self._last_toast_time = 0.0
+        self._last_toast_status: str | None = None
 
         # GUI Components
         self.root = tk.Tk()
@@ -76,8 +127,11 @@ class DuckHuntController:
         
         self.settings_window: SettingsWindow | None = None
         
-        # Queue for cross-thread Tkinter updates
-        self.gui_queue: queue.Queue[Callable[[], None]] = queue.Queue()
+        # Queue for cross-thread Tkinter updates. Producers post a Tk virtual
+        # event instead of Tk polling on a timer; deque append/popleft are
+        # atomic under CPython so no extra lock is needed.
+        self.gui_queue: collections.deque[Callable[[], None]] = collections.deque()
+        self.root.bind("<<GuiQueue>>", lambda e: self._drain_gui_queue())
 
         # Session Monitor (Event-Based)
         self.session_monitor = SessionMonitor(
@@ -100,11 +154,8 @@ class DuckHuntController:
         
         # 2. Start IPC Server
         self.start_ipc_server()
-        
-        # 3. Start Window IPC Server (Single Instance)
-        self.start_window_ipc_server()
-        
-        # 4. Launch Watchdog (if not present and enabled)
+
+        # 3. Launch Watchdog (if not present and enabled)
         if not self.watchdog_pid and self.config.watchdog_enabled:
             self.launch_watchdog()
         elif self.watchdog_pid:
@@ -113,28 +164,34 @@ class DuckHuntController:
              # Just launch daemon directly if no watchdog
              self.launch_daemon()
 
-        # 5. Start auto-start retries (for daemon connection, which Watchdog spawns)
-        threading.Thread(target=self._auto_start_monitor, daemon=True).start()
+        # 4. Start auto-start retries (for daemon connection, which Watchdog spawns)
+        self.root.after(100, self._tick_autostart)
 
-        # 6. Start Tray Icon (in background thread)
-        threading.Thread(target=self.tray.start, daemon=True).start()
+        # 5. Start Tray Icon (pystray drives its own loop; no thread of ours)
+        self.tray.start_detached()
 
-        # 7. Start GUI processing loop
-        self.process_gui_queue()
-        
-        # 8. Enter Tkinter Mainloop
+        # 6. Enter Tkinter Mainloop
         self.root.mainloop()
 
-    def process_gui_queue(self) -> None:
-        """Process GUI updates in main thread."""
+    def _post(self, callback: Callable[[], None]) -> None:
+        """Queue a callback to run on the Tk main thread and wake it."""
+        self.gui_queue.append(callback)
         try:
-            while True:
-                callback = self.gui_queue.get_nowait()
-                callback()
-        except queue.Empty:
+            # Thread-safe in Tk; wakes the mainloop immediately instead of
+            # waiting on a polling timer
+            self.root.event_generate("<<GuiQueue>>", when="tail")
+        except Exception:
+            # Root may be gone during shutdown
             pass
-        finally:
-            self.root.after(50, self.process_gui_queue)
+
+    def _drain_gui_queue(self) -> None:
+        """Process GUI updates in main thread."""
+        while True:
+            try:
+                callback = self.gui_queue.popleft()
+            except IndexError:
+                break
+            callback()
 
     def on_session_lock(self) -> None:
         """Called when workstation locks."""
@@ -147,7 +204,7 @@ class DuckHuntController:
         self.is_locked = False
         if self.incident_pending:
             # User is back! Show notification safely on main thread
-            self.gui_queue.put(lambda: self.tray.show_notification(
+            self._post(lambda: self.tray.show_notification(
                 "Attack Detected!", 
                 "Workstation was locked to protect your system."
             ))
@@ -161,7 +218,7 @@ class DuckHuntController:
 
     def on_settings_request(self) -> None:
         # Must run on main thread
-        self.gui_queue.put(self._open_settings)
+        self._post(self._open_settings)
 
     def _open_settings(self) -> None:
         if not self.settings_window:
@@ -175,23 +232,21 @@ class DuckHuntController:
             pass
 
     def on_exit_request(self) -> None:
-        self.gui_queue.put(self._shutdown)
+        self._post(self._shutdown)
 
     def _shutdown(self) -> None:
         self.send_command(MSG_EXIT)
-        self.send_command(MSG_EXIT)
-        
-        # We must kill the watchdog so it doesn't revive us
-        if self.watchdog_process:
-             # We spawned it
-             self.watchdog_process.terminate()
-        elif self.watchdog_pid:
-             # We didn't spawn it, but we know its PID.
-             # We should try to kill it.
-             try:
-                 subprocess.run(["taskkill", "/F", "/PID", str(self.watchdog_pid)], capture_output=True)
-             except Exception:
-                 pass
+        # Don't let a full pipe (daemon already gone) hang shutdown: close
+        # the connection shortly after regardless of whether the daemon read it
+        conn = self.client_conn
+        if conn:
+            threading.Timer(0.5, self._close_conn, args=(conn,)).start()
+
+        # We must kill the watchdog so it doesn't revive us; works for both
+        # a watchdog we spawned and an external one we only know by PID
+        if self.watchdog_pid:
+             terminate_pid(self.watchdog_pid)
+        self._close_watchdog_spawn_handle()
 
         if self.daemon_process:
             self.daemon_process.terminate()
@@ -205,14 +260,15 @@ class DuckHuntController:
             except Exception:
                 pass
 
-        if self.window_listener:
-            try:
-                self.window_listener.close()
-            except Exception:
-                pass
-
         self.root.quit()
 
+    @staticmethod
+    def _close_conn(conn: Any) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
     def start_ipc_server(self) -> None:
         try:
             address = get_ipc_address()
@@ -226,84 +282,77 @@ class DuckHuntController:
             while True:
                 try:
                     conn = self.listener.accept()
-                    self.client_conn = conn
+                    with self._conn_lock:
+                        self.client_conn = conn
+                    self._client_connected.set()
                     self.handle_client(conn)
                 except Exception:
                     break
 
-        threading.Thread(target=accept_loop, daemon=True).start()
-
-    def start_window_ipc_server(self) -> None:
-        """Start IPC server for single-instance enforcement."""
-        try:
-            address = get_window_ipc_address()
-            # No auth key needed for this simple signal check, or use same one?
-            # It's better to use no auth key or a known static one because the client 
-            # (new instance) won't know the random auth key of the server.
-            # Using None for authkey means no authentication.
-            self.window_listener = Listener(address, authkey=None)
-        except Exception:
-            # If we fail to bind, maybe another instance is running? 
-            # But main check should handle that. If we are here, we passed main check.
-            # Just ignore if fails, worst case single instance check doesn't work.
-            return
-
-        def window_accept_loop() -> None:
-            if not self.window_listener:
-                return
-            while True:
-                try:
-                    conn = self.window_listener.accept()
-                    self.handle_window_client(conn)
-                except Exception:
-                    break
-        
-        threading.Thread(target=window_accept_loop, daemon=True).start()
-
-    def handle_window_client(self, conn: Any) -> None:
-        try:
-            # We just need to accept the connection to confirm existence.
-            # No message is exchanged.
-            pass 
-        except Exception:
-            pass
-        finally:
-            conn.close()
+        # Two accept threads so a reconnecting daemon doesn't queue behind
+        # an accept that is still mid-handshake
+        for _ in range(2):
+            threading.Thread(target=accept_loop, daemon=True).start()
 
     def handle_client(self, conn: Any) -> None:
         while True:
+            # Block once, then drain everything already buffered so a burst
+            # of daemon messages is handled as one batch
             try:
-                msg = conn.recv()
+                if not conn.poll(1.0):
+                    continue
+                frames = [conn.recv_bytes()]
+                while conn.poll(0):
+                    frames.append(conn.recv_bytes())
             except EOFError:
                 break
             except Exception:
                 break
 
-            if isinstance(msg, IPCMessage):
+            last_status: IPCMessage | None = None
+            for frame in frames:
+                try:
+                    msg = decode_message(frame)
+                except ValueError:
+                    # Malformed frame; skip it
+                    continue
                 if msg.type == MSG_STATUS:
-                    self._handle_status(msg)
+                    # Coalesce: only the final status of the batch matters
+                    last_status = msg
                 elif msg.type == MSG_DETECTED:
                     self._handle_detected()
-        
-        if self.client_conn == conn:
-            self.client_conn = None
+            if last_status is not None:
+                self._handle_status(last_status)
+
+        with self._conn_lock:
+            if self.client_conn == conn:
+                self.client_conn = None
+                self._client_connected.clear()
 
     def _handle_status(self, msg: IPCMessage) -> None:
         new_status = msg.payload.get("status", "unknown") if msg.payload else "unknown"
         old_status = self.daemon_status
         self.daemon_status = new_status
         
-        if old_status != new_status:
+        # Rate-limit toasts: a stopped->running->stopped flap (config push,
+        # attack-then-reset) shouldn't pump a balloon per transition. The
+        # tray running-state below still updates on every message.
+        now = time.monotonic()
+        if (old_status != new_status
+                and new_status != self._last_toast_status
+                and now - self._last_toast_time >= 2.0):
+            toast = None
             if new_status == "running":
-                self.gui_queue.put(lambda: self.tray.show_notification(
-                    "Protection Enabled", 
-                    "DuckHunt is now monitoring keystroke patterns."
-                ))
+                toast = ("Protection Enabled",
+                         "DuckHunt is now monitoring keystroke patterns.")
             elif new_status == "stopped":
-                self.gui_queue.put(lambda: self.tray.show_notification(
-                    "Protection Disabled", 
-                    "DuckHunt monitoring is stopped."
-                ))
+                toast = ("Protection Disabled",
+                         "DuckHunt monitoring is stopped.")
+            if toast:
+                self._last_toast_time = now
+                self._last_toast_status = new_status
+                title, message = toast
+                self._post(lambda: self.tray.show_notification(title, message))
 
         # Update Tray Menu
         is_running = (new_status == "running")
@@ -317,31 +366,32 @@ class DuckHuntController:
 
     def send_command(self, type: str, payload: dict[str, Any] | None = None) -> None:
         if self.client_conn:
-            msg = IPCMessage(type, payload)
             try:
-                self.client_conn.send(msg)
+                self.client_conn.send_bytes(encode_message(type, payload))
             except Exception:
                 self.client_conn = None
 
     def launch_watchdog(self) -> None:
-        """Launch the Watchdog process."""
-        env = os.environ.copy()
-        # Ensure key is passed
-        
-        cmd = []
-        if getattr(sys, 'frozen', False):
-            cmd = [sys.executable, "--watchdog", "--parent-pid", str(os.getpid()), "--auth-key", self.auth_key.hex()]
-        else:
-            cmd = [sys.executable, "-m", "duckhunt_win", "--watchdog", "--parent-pid", str(os.getpid()), "--auth-key", self.auth_key.hex()]
-            
-        self.watchdog_process = subprocess.Popen(
-             cmd,
-             env=env,
-             creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0,
-        )
-        self.watchdog_pid = self.watchdog_process.pid
+        """Launch the Watchdog process.
+
+        This is the hot recovery path when a watchdog dies, so it goes
+        straight to CreateProcess with the precomputed command line
+        instead of through subprocess.Popen.
+        """
+        try:
+            handle, pid = create_process(self._watchdog_cmdline, self._spawn_flags)
+        except OSError:
+            return
+        self._close_watchdog_spawn_handle()
+        self._watchdog_spawn_handle = handle
+        self.watchdog_pid = pid
         self.monitor_watchdog()
 
+    def _close_watchdog_spawn_handle(self) -> None:
+        if self._watchdog_spawn_handle:
+            ctypes.windll.kernel32.CloseHandle(self._watchdog_spawn_handle)
+            self._watchdog_spawn_handle = None
+
     def update_watchdog_state(self, enabled: bool) -> None:
         """Enable or disable the watchdog process at runtime."""
         # Update config directly as this is called after config update
@@ -356,91 +406,143 @@ class DuckHuntController:
                 self.launch_watchdog()
         else:
             if self.watchdog_pid:
-                # We need to stop monitoring it first!
-                self.watchdog_pid = None # This stops the monitor loop (it checks self.watchdog_pid)
-                
-                # Kill the process
-                if self.watchdog_process:
-                    self.watchdog_process.terminate()
-                    self.watchdog_process = None
-                else:
-                    # External watchdog? We cannot kill it easily if we didn't start it?
-                    # But launch_watchdog sets watchdog_process.
-                    # If we were started BY watchdog, we have watchdog_pid but no process object.
-                    pass
+                # Stop monitoring it first so its death doesn't trigger a
+                # relaunch, then kill it (spawned or external alike)
+                pid = self.watchdog_pid
+                self.watchdog_pid = None
+                self._cleanup_watchdog_wait()
+                self._watchdog_tick_armed = False
+                terminate_pid(pid)
+                self._close_watchdog_spawn_handle()
 
     def monitor_watchdog(self) -> None:
-        """Monitor watchdog process to ensure it stays alive."""
-        def _monitor() -> None:
-             from duckhunt_win.utils import is_pid_running
-             import time
-             while True:
-                 time.sleep(1.0)
-                 if self.watchdog_pid:
-                    if not is_pid_running(self.watchdog_pid):
-                        print("Controller: Watchdog died. Restarting...")
-                        self.launch_watchdog()
-                 else:
-                    self.launch_watchdog()
-
-        threading.Thread(target=_monitor, daemon=True).start()
+        """Watch the watchdog process and restart it if it dies.
+
+        Preferred path: a kernel wait registration on the process handle,
+        so the thread pool calls us back the moment the watchdog exits.
+        Falls back to a 1 Hz liveness tick on the Tk mainloop.
+        """
+        if self.watchdog_pid and self._arm_watchdog_wait():
+            # The kernel callback owns monitoring now; retire any fallback
+            # tick so one death can't be observed (and restarted) twice
+            self._watchdog_tick_armed = False
+            return
+        if self._watchdog_tick_armed:
+            return
+        self._watchdog_tick_armed = True
+        self.root.after(1000, self._tick_watchdog)
+
+    def _arm_watchdog_wait(self) -> bool:
+        """Register a kernel callback for watchdog process exit."""
+        self._cleanup_watchdog_wait()
+        kernel32 = ctypes.windll.kernel32
+        hproc = kernel32.OpenProcess(SYNCHRONIZE, False, self.watchdog_pid)
+        if not hproc:
+            return False
+
+        def _on_died(param: Any, fired: Any) -> None:
+            # Runs on a thread-pool thread; hop to the Tk main thread where
+            # launch_watchdog's state lives
+            self._post(self._on_watchdog_exit)
+
+        self._watchdog_wait_cb = WAITORTIMERCALLBACK(_on_died)
+        wait_handle = wintypes.HANDLE()
+        ok = kernel32.RegisterWaitForSingleObject(
+            ctypes.byref(wait_handle),
+            hproc,
+            self._watchdog_wait_cb,
+            None,
+            INFINITE,
+            WT_EXECUTEONLYONCE,
+        )
+        if not ok:
+            kernel32.CloseHandle(hproc)
+            return False
+        self._watchdog_wait_handle = wait_handle
+        self._watchdog_proc_handle = hproc
+        return True
+
+    def _cleanup_watchdog_wait(self) -> None:
+        kernel32 = ctypes.windll.kernel32
+        if self._watchdog_wait_handle:
+            kernel32.UnregisterWait(self._watchdog_wait_handle)
+            self._watchdog_wait_handle = None
+        if self._watchdog_proc_handle:
+            kernel32.CloseHandle(self._watchdog_proc_handle)
+            self._watchdog_proc_handle = None
+
+    def _on_watchdog_exit(self) -> None:
+        self._cleanup_watchdog_wait()
+        if self.watchdog_pid:
+            print("Controller: Watchdog died. Restarting...")
+            self.launch_watchdog()
+
+    def _tick_watchdog(self) -> None:
+        if not self._watchdog_tick_armed:
+            # A kernel wait was armed after this tick was scheduled
+            return
+        if self.watchdog_pid and not is_pid_running(self.watchdog_pid):
+            print("Controller: Watchdog died. Restarting...")
+            self.launch_watchdog()
+            if not self._watchdog_tick_armed:
+                # monitor_watchdog armed a kernel wait for the new process
+                return
+        self.root.after(1000, self._tick_watchdog)
 
     def launch_daemon(self) -> None:
         if self.daemon_process and self.daemon_process.poll() is None:
             return
 
-        env = os.environ.copy()
-        
-        if getattr(sys, 'frozen', False):
-            # Running as compiled executable
-            cmd = [sys.executable, "--daemon"]
-        else:
-            # Running as script
-            cmd = [sys.executable, "-m", "duckhunt_win.daemon"]
-
+        # env=None inherits our environment (DUCKHUNT_AUTH_KEY is set in
+        # os.environ at init); no need to copy the whole environ per launch
         self.daemon_process = subprocess.Popen(
-            cmd,
-            env=env,
-            creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0,
+            self._daemon_cmd,
+            creationflags=self._spawn_flags,
         )
 
-    def _auto_start_monitor(self) -> None:
-         import time
-         for i in range(50):
-             if self.client_conn:
-                 self.send_command(MSG_START)
-                 break
-             time.sleep(0.1)
+    def _tick_autostart(self, retries_left: int = 50) -> None:
+        # Chained after-callback instead of a thread blocking on the
+        # connection event; stops once the daemon shows up or retries run out
+        if self._client_connected.is_set():
+            self.send_command(MSG_START)
+            return
+        if retries_left > 0:
+            self.root.after(100, self._tick_autostart, retries_left - 1)
 
     def check_startup(self) -> bool:
+        # Cached: only this app toggles the value, so re-querying the
+        # registry on every settings-window open is wasted syscalls
+        if self._startup_cached is not None:
+            return self._startup_cached
+
+        import winreg
+
         try:
-            key = winreg.OpenKey(
-                winreg.HKEY_CURRENT_USER,
-                str(Path(r"Software\Microsoft\Windows\CurrentVersion\Run")),
-                0,
-                winreg.KEY_READ,
-            )
-            winreg.QueryValueEx(key, "DuckHunt")
-            winreg.CloseKey(key)
-            return True
+            with winreg.OpenKey(
+                winreg.HKEY_CURRENT_USER, RUN_KEY, 0, winreg.KEY_READ
+            ) as key:
+                winreg.QueryValueEx(key, "DuckHunt")
+            self._startup_cached = True
         except WindowsError:
-            return False
+            self._startup_cached = False
+        return self._startup_cached
 
     def toggle_startup(self, enable: bool) -> None:
-        key_path = str(Path(r"Software\Microsoft\Windows\CurrentVersion\Run"))
+        import winreg
+
         try:
-            key = winreg.OpenKey(
-                winreg.HKEY_CURRENT_USER, key_path, 0, winreg.KEY_ALL_ACCESS
-            )
-            if enable:
-                exe = sys.executable
-                cmd = f'"{exe}" -m duckhunt_win'
-                winreg.SetValueEx(key, "DuckHunt", 0, winreg.REG_SZ, cmd)
-            else:
-                try:
-                    winreg.DeleteValue(key, "DuckHunt")
-                except WindowsError:
-                    pass
-            winreg.CloseKey(key)
+            with winreg.OpenKey(
+                winreg.HKEY_CURRENT_USER, RUN_KEY, 0, winreg.KEY_ALL_ACCESS
+            ) as key:
+                if enable:
+                    exe = sys.executable
+                    cmd = f'"{exe}" -m duckhunt_win'
+                    winreg.SetValueEx(key, "DuckHunt", 0, winreg.REG_SZ, cmd)
+                else:
+                    try:
+                        winreg.DeleteValue(key, "DuckHunt")
+                    except WindowsError:
+                        pass
+            self._startup_cached = enable
         except Exception:
             pass
@@ -15,6 +15,10 @@ WM_WTSSESSION_CHANGE = 0x02B1
 WTS_SESSION_LOCK = 0x7
 WTS_SESSION_UNLOCK = 0x8
 NOTIFY_FOR_THIS_SESSION = 0
+PM_REMOVE = 0x0001
+QS_ALLINPUT = 0x04FF
+INFINITE = 0xFFFFFFFF
+WAIT_OBJECT_0 = 0
 
 # ctypes definitions
 user32 = ctypes.windll.user32
@@ -29,9 +33,6 @@ else:
 
 WNDPROC = ctypes.WINFUNCTYPE(LRESULT, wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM)
 
-user32.DefWindowProcW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
-user32.DefWindowProcW.restype = LRESULT
-
 
 class WNDCLASS(ctypes.Structure):
     _fields_ = [
@@ -48,6 +49,75 @@ class WNDCLASS(ctypes.Structure):
     ]
 
 
+# Bind the Win32 entry points once at import with explicit prototypes.
+# Attribute access on a ctypes DLL object is a dict lookup per call, and
+# without argtypes ctypes falls back to generic int marshalling for every
+# message pumped — both avoidable in a loop that runs per window message.
+_DefWindowProcW = user32.DefWindowProcW
+_DefWindowProcW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+_DefWindowProcW.restype = LRESULT
+
+_GetModuleHandleW = kernel32.GetModuleHandleW
+_GetModuleHandleW.argtypes = [wintypes.LPCWSTR]
+_GetModuleHandleW.restype = wintypes.HMODULE
+
+_RegisterClassW = user32.RegisterClassW
+_RegisterClassW.argtypes = [ctypes.POINTER(WNDCLASS)]
+_RegisterClassW.restype = wintypes.ATOM
+
+_UnregisterClassW = user32.UnregisterClassW
+_UnregisterClassW.argtypes = [wintypes.LPCWSTR, wintypes.HINSTANCE]
+_UnregisterClassW.restype = wintypes.BOOL
+
+_CreateWindowExW = user32.CreateWindowExW
+_CreateWindowExW.argtypes = [
+    wintypes.DWORD, wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.DWORD,
+    ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+    wintypes.HWND, wintypes.HMENU, wintypes.HINSTANCE, wintypes.LPVOID,
+]
+_CreateWindowExW.restype = wintypes.HWND
+
+_DestroyWindow = user32.DestroyWindow
+_DestroyWindow.argtypes = [wintypes.HWND]
+_DestroyWindow.restype = wintypes.BOOL
+
+_TranslateMessage = user32.TranslateMessage
+_TranslateMessage.argtypes = [ctypes.POINTER(wintypes.MSG)]
+_TranslateMessage.restype = wintypes.BOOL
+
+_DispatchMessageW = user32.DispatchMessageW
+_DispatchMessageW.argtypes = [ctypes.POINTER(wintypes.MSG)]
+_DispatchMessageW.restype = LRESULT
+
+_WTSRegisterSessionNotification = wtsapi32.WTSRegisterSessionNotification
+_WTSRegisterSessionNotification.argtypes = [wintypes.HWND, wintypes.DWORD]
+_WTSRegisterSessionNotification.restype = wintypes.BOOL
+
+_WTSUnRegisterSessionNotification = wtsapi32.WTSUnRegisterSessionNotification
+_WTSUnRegisterSessionNotification.argtypes = [wintypes.HWND]
+_WTSUnRegisterSessionNotification.restype = wintypes.BOOL
+
+_PeekMessageW = user32.PeekMessageW
+_PeekMessageW.argtypes = [ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT, wintypes.UINT]
+_PeekMessageW.restype = wintypes.BOOL
+
+_MsgWaitForMultipleObjectsEx = user32.MsgWaitForMultipleObjectsEx
+_MsgWaitForMultipleObjectsEx.argtypes = [wintypes.DWORD, ctypes.POINTER(wintypes.HANDLE), wintypes.DWORD, wintypes.DWORD, wintypes.DWORD]
+_MsgWaitForMultipleObjectsEx.restype = wintypes.DWORD
+
+_CreateEventW = kernel32.CreateEventW
+_CreateEventW.argtypes = [wintypes.LPVOID, wintypes.BOOL, wintypes.BOOL, wintypes.LPCWSTR]
+_CreateEventW.restype = wintypes.HANDLE
+
+_SetEvent = kernel32.SetEvent
+_SetEvent.argtypes = [wintypes.HANDLE]
+_SetEvent.restype = wintypes.BOOL
+
+_CloseHandle = kernel32.CloseHandle
+_CloseHandle.argtypes = [wintypes.HANDLE]
+_CloseHandle.restype = wintypes.BOOL
+
+
 class SessionMonitor:
     """Monitors Windows Session events (Lock/Unlock)."""
 
@@ -57,6 +127,10 @@ class SessionMonitor:
         self.hwnd: Optional[int] = None
         self._thread: Optional[threading.Thread] = None
         self._running = False
+        self._wnd_proc: Optional[WNDPROC] = None
+        # Manual-reset event the pump waits on alongside window messages,
+        # giving stop() a deterministic wakeup without synthetic WM_CLOSE
+        self._stop_evt: Optional[int] = _CreateEventW(None, True, False, None)
 
     def start(self) -> None:
         """Start the monitor thread."""
@@ -67,37 +141,47 @@ class SessionMonitor:
         self._thread.start()
 
     def stop(self) -> None:
-        """Stop the monitor (best effort, as GetMessage blocks)."""
+        """Stop the monitor."""
         self._running = False
-        if self.hwnd:
-            user32.PostMessageW(self.hwnd, 0x0010, 0, 0) # WM_CLOSE
+        if self._stop_evt:
+            _SetEvent(self._stop_evt)
 
     def _run(self) -> None:
         """Message loop thread."""
-        hInstance = kernel32.GetModuleHandleW(None)
+        hInstance = _GetModuleHandleW(None)
         class_name = "DuckHuntSessionMonitor"
 
+        # Captured as closure locals so the callback doesn't do attribute
+        # lookups on self per message
+        on_lock = self.on_lock
+        on_unlock = self.on_unlock
+
         def wnd_proc(hwnd: int, msg: int, wParam: int, lParam: int) -> int:
             if msg == WM_WTSSESSION_CHANGE:
+                # Only lock/unlock matter; the other session sub-events
+                # (console/remote connect etc.) return without dispatching
+                # into any further Python code
                 if wParam == WTS_SESSION_LOCK:
-                    self.on_lock()
+                    on_lock()
                 elif wParam == WTS_SESSION_UNLOCK:
-                    self.on_unlock()
-            elif msg == 0x0010: # WM_CLOSE
-                 user32.PostQuitMessage(0)
-                 return 0
-            return user32.DefWindowProcW(hwnd, msg, wParam, lParam)
+                    on_unlock()
+                return 0
+            return _DefWindowProcW(hwnd, msg, wParam, lParam)
+
+        # Keep the callback thunk alive on self so GC can't collect it while
+        # the window class still points at it
+        self._wnd_proc = WNDPROC(wnd_proc)
 
         wnd_class = WNDCLASS()
-        wnd_class.lpfnWndProc = WNDPROC(wnd_proc)
+        wnd_class.lpfnWndProc = self._wnd_proc
         wnd_class.hInstance = hInstance
         wnd_class.lpszClassName = class_name
 
-        if not user32.RegisterClassW(ctypes.byref(wnd_class)):
+        if not _RegisterClassW(ctypes.byref(wnd_class)):
              # Class might already be registered
              pass
 
-        self.hwnd = user32.CreateWindowExW(
+        self.hwnd = _CreateWindowExW(
             0,
             class_name,
             "DuckHunt Hidden Monitor",
@@ -113,18 +197,27 @@ class SessionMonitor:
             return
 
         # Register for session notifications
-        if not wtsapi32.WTSRegisterSessionNotification(self.hwnd, NOTIFY_FOR_THIS_SESSION):
+        if not _WTSRegisterSessionNotification(self.hwnd, NOTIFY_FOR_THIS_SESSION):
              pass
 
-        # Message pump
+        # Message pump: sleep in the kernel until either the stop event is
+        # signaled or input arrives for this thread, then drain all pending
+        # messages before waiting again
         msg = wintypes.MSG()
+        msg_ref = ctypes.byref(msg)
+        handles = (wintypes.HANDLE * 1)(self._stop_evt)
         while self._running:
-            bRet = user32.GetMessageW(ctypes.byref(msg), 0, 0, 0)
-            if bRet == 0 or bRet == -1:
+            res = _MsgWaitForMultipleObjectsEx(1, handles, INFINITE, QS_ALLINPUT, 0)
+            if res == WAIT_OBJECT_0:
+                # stop() signaled the event
                 break
-            user32.TranslateMessage(ctypes.byref(msg))
-            user32.DispatchMessageW(ctypes.byref(msg))
-
-        wtsapi32.WTSUnRegisterSessionNotification(self.hwnd)
-        user32.DestroyWindow(self.hwnd)
-        user32.UnregisterClassW(class_name, hInstance)
+            while _PeekMessageW(msg_ref, None, 0, 0, PM_REMOVE):
+                _TranslateMessage(msg_ref)
+                _DispatchMessageW(msg_ref)
+
+        _WTSUnRegisterSessionNotification(self.hwnd)
+        _DestroyWindow(self.hwnd)
+        _UnregisterClassW(class_name, hInstance)
+        if self._stop_evt:
+            _CloseHandle(self._stop_evt)
+            self._stop_evt = None
@@ -1,13 +1,16 @@
 import ctypes
 from ctypes import wintypes
 import os
+import queue
 import sys
 import time
 import atexit
+import _winapi
 from multiprocessing.connection import Client
 from typing import Any
 
 from duckhunt_win.detector import KeystrokeDetector
+from duckhunt_win.utils import KBDLLHOOKSTRUCT, LLKHF_INJECTED
 from duckhunt_win.ipc import (
     MSG_DETECTED,
     MSG_EXIT,
@@ -15,7 +18,8 @@ from duckhunt_win.ipc import (
     MSG_STATUS,
     MSG_STOP,
     MSG_CONFIG,
-    IPCMessage,
+    decode_message,
+    encode_message,
     get_ipc_address,
 )
 
@@ -27,21 +31,64 @@ kernel32 = ctypes.windll.kernel32
 WH_KEYBOARD_LL = 13
 WM_KEYDOWN = 0x0100
 WM_SYSKEYDOWN = 0x0104
-LLKHF_INJECTED = 0x00000010
-
-# Hook Struct
-class KBDLLHOOKSTRUCT(ctypes.Structure):
-    _fields_ = [
-        ("vkCode", wintypes.DWORD),
-        ("scanCode", wintypes.DWORD),
-        ("flags", wintypes.DWORD),
-        ("time", wintypes.DWORD),
-        ("dwExtraInfo", ctypes.POINTER(wintypes.ULONG))
-    ]
+PM_REMOVE = 0x0001
+QS_ALLINPUT = 0x04FF
+WAIT_OBJECT_0 = 0
 
 # Callback type
 CMPFUNC = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_int, wintypes.WPARAM, ctypes.POINTER(KBDLLHOOKSTRUCT))
 
+if ctypes.sizeof(ctypes.c_void_p) == 8:
+    LRESULT = ctypes.c_int64
+else:
+    LRESULT = ctypes.c_long
+
+# Hot-path Win32 entry points bound once at import with explicit
+# prototypes. Attribute access on the DLL object costs a dict lookup per
+# call, and without argtypes ctypes marshals arguments generically — both
+# matter in the hook callback and the per-wakeup message pump.
+# c_void_p for the hook handle/lParam lets both ints and struct pointers
+# pass through unconverted.
+_CallNextHookEx = user32.CallNextHookEx
+_CallNextHookEx.argtypes = [ctypes.c_void_p, ctypes.c_int, wintypes.WPARAM, ctypes.c_void_p]
+_CallNextHookEx.restype = LRESULT
+
+_SetWindowsHookExA = user32.SetWindowsHookExA
+_SetWindowsHookExA.argtypes = [ctypes.c_int, CMPFUNC, wintypes.HINSTANCE, wintypes.DWORD]
+_SetWindowsHookExA.restype = ctypes.c_void_p
+
+_UnhookWindowsHookEx = user32.UnhookWindowsHookEx
+_UnhookWindowsHookEx.argtypes = [ctypes.c_void_p]
+_UnhookWindowsHookEx.restype = wintypes.BOOL
+
+_GetModuleHandleW = kernel32.GetModuleHandleW
+_GetModuleHandleW.argtypes = [wintypes.LPCWSTR]
+_GetModuleHandleW.restype = wintypes.HMODULE
+
+_PeekMessageW = user32.PeekMessageW
+_PeekMessageW.argtypes = [ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT, wintypes.UINT]
+_PeekMessageW.restype = wintypes.BOOL
+
+_TranslateMessage = user32.TranslateMessage
+_TranslateMessage.argtypes = [ctypes.POINTER(wintypes.MSG)]
+_TranslateMessage.restype = wintypes.BOOL
+
+_DispatchMessageW = user32.DispatchMessageW
+_DispatchMessageW.argtypes = [ctypes.POINTER(wintypes.MSG)]
+_DispatchMessageW.restype = LRESULT
+
+_MsgWaitForMultipleObjects = user32.MsgWaitForMultipleObjects
+_MsgWaitForMultipleObjects.argtypes = [wintypes.DWORD, ctypes.POINTER(wintypes.HANDLE), wintypes.BOOL, wintypes.DWORD, wintypes.DWORD]
+_MsgWaitForMultipleObjects.restype = wintypes.DWORD
+
+_WaitNamedPipeW = kernel32.WaitNamedPipeW
+_WaitNamedPipeW.argtypes = [wintypes.LPCWSTR, wintypes.DWORD]
+_WaitNamedPipeW.restype = wintypes.BOOL
+
+_LockWorkStation = user32.LockWorkStation
+_LockWorkStation.argtypes = []
+_LockWorkStation.restype = wintypes.BOOL
+
 
 class DuckHuntDaemon:
     """Daemon process that monitors keystrokes and locks workstation."""
@@ -52,6 +99,21 @@ class DuckHuntDaemon:
         self.conn: Any = None
         self._hook_id = None
         self._hook_proc = None # Keep reference to avoid GC
+        # Keystroke timestamps queued by the hook callback, drained by run().
+        # Keeps the OS hook callback minimal: Windows silently unhooks
+        # callbacks that are too slow (LowLevelHooksTimeout).
+        self._events: queue.SimpleQueue[int] = queue.SimpleQueue()
+        # Bound methods cached once: the hook callback must stay cheap and
+        # allocation-light, so it skips the per-call attribute lookups
+        self._enqueue = self._events.put_nowait
+
+        # Fixed messages encoded once; the detection path in particular
+        # shouldn't serialize anything while racing an injection attack
+        self._detected_frame = encode_message(MSG_DETECTED, {"action": "locked"})
+        self._status_frames = {
+            status: encode_message(MSG_STATUS, {"status": status})
+            for status in ("connected", "running", "stopped")
+        }
         
         # Get Auth Key from environment
         auth_key_hex = os.environ.get("DUCKHUNT_AUTH_KEY")
@@ -64,6 +126,11 @@ class DuckHuntDaemon:
         """Connect to the GUI process."""
         try:
             address = get_ipc_address()
+            # Wait in the kernel (up to 5 s) for the GUI's pipe to accept a
+            # connection; returns immediately if the pipe doesn't exist yet,
+            # so the retry loop's backoff still applies in that case
+            if not _WaitNamedPipeW(address, 5000):
+                return False
             self.conn = Client(address, authkey=self.auth_key)
             self.send_status("connected")
             return True
@@ -71,53 +138,93 @@ class DuckHuntDaemon:
             # GUI not running or wait
             return False
 
-    def send_message(self, type: str, payload: dict[str, Any] | None = None) -> None:
-        """Send message to GUI."""
-        if self.conn:
-            msg = IPCMessage(type, payload)
+    def _send_frame(self, frame: bytes) -> None:
+        """Send a pre-encoded frame to the GUI."""
+        conn = self.conn
+        if conn:
             try:
-                self.conn.send(msg)
+                conn.send_bytes(frame)
             except Exception:
-                # Connection loss handled in run loop
-                raise
+                # Drop the connection and let run() fall back to its
+                # reconnect loop; a transient GUI restart must not take the
+                # daemon down with it. run() uninstalls the hook before
+                # reconnecting — the reconnect loop does not pump messages,
+                # and a hook on a non-pumping thread stalls every keystroke
+                # until Windows silently removes it.
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                self.conn = None
+
+    def send_message(self, type: str, payload: dict[str, Any] | None = None) -> None:
+        """Send message to GUI."""
+        self._send_frame(encode_message(type, payload))
 
     def send_status(self, status: str) -> None:
         """Send status update."""
-        self.send_message(MSG_STATUS, {"status": status})
+        frame = self._status_frames.get(status)
+        self._send_frame(frame if frame is not None
+                         else encode_message(MSG_STATUS, {"status": status}))
 
     def lock_workstation(self) -> None:
         """Lock the Windows workstation."""
-        self.send_message(MSG_DETECTED, {"action": "locked"})
-        user32.LockWorkStation()
+        self._send_frame(self._detected_frame)
+        _LockWorkStation()
         # Reset detection to avoid loop
         self.detector.reset()
 
-    def _low_level_keyboard_proc(self, nCode, wParam, lParam):
-        """Windows Hook Callback."""
-        if nCode >= 0:
-            if wParam == WM_KEYDOWN or wParam == WM_SYSKEYDOWN:
-                if self.running:
-                    kb_struct = lParam.contents
-                    is_injected = bool(kb_struct.flags & LLKHF_INJECTED)
-                    
-                    # Detect
-                    is_suspicious = self.detector.process_keystroke(is_injected=is_injected)
-                    if is_suspicious:
-                        self.lock_workstation()
-        
-        return user32.CallNextHookEx(self._hook_id, nCode, wParam, lParam)
+    def _drain_events(self) -> None:
+        """Run detection over all keystrokes queued by the hook callback."""
+        events = self._events
+        process = self.detector.process_keystroke
+        while True:
+            try:
+                timestamp = events.get_nowait()
+            except queue.Empty:
+                return
+            if process(timestamp):
+                # lock_workstation resets the detector, so draining the
+                # remaining events cannot re-trigger on the same burst
+                self.lock_workstation()
 
     def start_monitoring(self) -> None:
         """Start keyboard listener (Install Hook)."""
         if not self._hook_id:
-            self._hook_proc = CMPFUNC(self._low_level_keyboard_proc)
-            self._hook_id = user32.SetWindowsHookExA(
-                WH_KEYBOARD_LL, 
-                self._hook_proc, 
-                kernel32.GetModuleHandleW(None), 
+            # The callback is built as a closure so everything it touches
+            # per keystroke is a local cell, not an attribute lookup on
+            # self. Windows silently unhooks callbacks that run slow
+            # (LowLevelHooksTimeout), so every dict hit saved counts.
+            enqueue = self._enqueue
+            call_next = _CallNextHookEx
+            detector = self.detector
+            hook_id = 0  # cell is rebound once the hook is installed below
+
+            def _hook_proc(nCode: int, wParam: int, lParam: Any) -> int:
+                if nCode >= 0 and self.running:
+                    if wParam == WM_KEYDOWN or wParam == WM_SYSKEYDOWN:
+                        kb_struct = lParam.contents
+                        # Injected keys the user allows (e.g. KeePass
+                        # auto-type) are filtered here, before they ever
+                        # reach the detector's history. kb_struct.time is
+                        # the kernel's ms tick at event generation — no
+                        # clock read needed, and immune to Python
+                        # scheduling delay between event and callback.
+                        if not (kb_struct.flags & LLKHF_INJECTED
+                                and detector.allow_auto_type):
+                            enqueue(kb_struct.time)
+                return call_next(hook_id, nCode, wParam, lParam)
+
+            self._hook_proc = CMPFUNC(_hook_proc)
+            hook_id = _SetWindowsHookExA(
+                WH_KEYBOARD_LL,
+                self._hook_proc,
+                _GetModuleHandleW(None),
                 0
             )
-            if not self._hook_id:
+            self._hook_id = hook_id
+            if not hook_id:
+                 self._hook_proc = None
                  print(f"Failed to install hook: {ctypes.GetLastError()}", file=sys.stderr)
                  return
 
@@ -128,7 +235,7 @@ class DuckHuntDaemon:
         """Stop keyboard monitoring (Uninstall Hook)."""
         self.running = False
         if self._hook_id:
-            user32.UnhookWindowsHookEx(self._hook_id)
+            _UnhookWindowsHookEx(self._hook_id)
             self._hook_id = None
             self._hook_proc = None
             
@@ -136,19 +243,35 @@ class DuckHuntDaemon:
         self.send_status("stopped")
 
     def set_high_priority(self) -> None:
-        """Set process priority to high for better responsiveness."""
+        """Prioritize the hook thread for low keystroke latency.
+
+        Only the thread pumping the keyboard hook needs aggressive
+        scheduling; keep the process class at ABOVE_NORMAL so the daemon
+        doesn't starve the rest of the user's system the way
+        HIGH_PRIORITY_CLASS on the whole process did.
+        """
         try:
             GetCurrentProcess = kernel32.GetCurrentProcess
             GetCurrentProcess.restype = wintypes.HANDLE
-            
+
             SetPriorityClass = kernel32.SetPriorityClass
             SetPriorityClass.argtypes = [wintypes.HANDLE, wintypes.DWORD]
             SetPriorityClass.restype = wintypes.BOOL
-            
-            HIGH_PRIORITY_CLASS = 0x00000080
-            
-            handle = GetCurrentProcess()
-            SetPriorityClass(handle, HIGH_PRIORITY_CLASS)
+
+            GetCurrentThread = kernel32.GetCurrentThread
+            GetCurrentThread.restype = wintypes.HANDLE
+
+            SetThreadPriority = kernel32.SetThreadPriority
+            SetThreadPriority.argtypes = [wintypes.HANDLE, ctypes.c_int]
+            SetThreadPriority.restype = wintypes.BOOL
+
+            ABOVE_NORMAL_PRIORITY_CLASS = 0x00008000
+            THREAD_PRIORITY_TIME_CRITICAL = 15
+
+            SetPriorityClass(GetCurrentProcess(), ABOVE_NORMAL_PRIORITY_CLASS)
+            # run() installs the hook and pumps messages on this thread, so
+            # this is the thread Windows calls the hook on
+            SetThreadPriority(GetCurrentThread(), THREAD_PRIORITY_TIME_CRITICAL)
         except Exception:
             pass
 
@@ -172,44 +295,128 @@ class DuckHuntDaemon:
                 # If disconnected, we stop monitoring.
                 time.sleep(1.0)
             
-            # Application Loop with Message Pump
-            while self.conn:
-                # 1. Pump Windows Messages (Non-blocking)
-                if user32.PeekMessageW(ctypes.byref(msg), 0, 0, 0, 1): # PM_REMOVE = 1
-                    user32.TranslateMessage(ctypes.byref(msg))
-                    user32.DispatchMessageW(ctypes.byref(msg))
-                
-                # 2. Check IPC Messages (Non-blocking polling)
-                if self.conn and self.conn.poll(0.01): # 10ms poll
+            # Application Loop: block in the kernel until either the pipe
+            # has data or input arrives for this thread (hook dispatch),
+            # instead of spinning PeekMessage + poll(0.01). A pipe handle
+            # itself is only signaled when an operation completes — data
+            # arrival with no pending read never signals it — so the wait
+            # target is the event of a pending zero-byte overlapped read,
+            # which fires the moment a message lands (the technique
+            # multiprocessing.connection.wait uses). The 1 s cap is a
+            # safety net in case a read could not be armed.
+            handle = self.conn._handle
+            msg_ref = ctypes.byref(msg)
+            wait_handles = (wintypes.HANDLE * 1)()
+            pending_read = None
+            exit_requested = False
+            while self.conn and not exit_requested:
+                pipe_ready = False
+                if pending_read is None:
                     try:
-                        msg_ipc = self.conn.recv()
-                        if isinstance(msg_ipc, IPCMessage):
-                            if msg_ipc.type == MSG_START:
-                                self.start_monitoring()
-                            elif msg_ipc.type == MSG_STOP:
-                                self.stop_monitoring()
-                            elif msg_ipc.type == MSG_CONFIG:
-                                if msg_ipc.payload:
-                                    self.detector.update_settings(
-                                        threshold_ms=msg_ipc.payload.get("threshold", 30),
-                                        history_size=msg_ipc.payload.get("history_size", 25),
-                                        burst_keys=msg_ipc.payload.get("burst_keys", 10),
-                                        burst_window_ms=msg_ipc.payload.get("burst_window_ms", 100),
-                                        allow_auto_type=msg_ipc.payload.get("allow_auto_type", True)
-                                    )
-                            elif msg_ipc.type == MSG_EXIT:
-                                self.stop_monitoring()
-                                if self.conn:
-                                    self.conn.close()
-                                return
-                    except (EOFError, Exception):
-                        self.conn = None
-                        self.stop_monitoring()
+                        ov, err = _winapi.ReadFile(handle, 0, True)
+                    except OSError:
+                        # Pipe broken; drop the connection below
                         break
-                
-                # Small sleep to yield CPU? call_next_hook might delay if we sleep too much
-                # PeekMessage logic usually is sufficient for CPU yielding if no msg
-                # But poll(0.01) waits up to 10ms. This is fine.
+                    if err == _winapi.ERROR_IO_PENDING:
+                        pending_read = ov
+                    else:
+                        # Data already buffered: the zero-byte read
+                        # completed on the spot
+                        ov.GetOverlappedResult(True)
+                        pipe_ready = True
+
+                if pending_read is not None:
+                    wait_handles[0] = pending_read.event
+                    res = _MsgWaitForMultipleObjects(
+                        1, wait_handles, False, 1000, QS_ALLINPUT
+                    )
+                else:
+                    res = WAIT_OBJECT_0
+
+                # 1. Pump Windows Messages (hook callbacks fire here)
+                while _PeekMessageW(msg_ref, None, 0, 0, PM_REMOVE):
+                    _TranslateMessage(msg_ref)
+                    _DispatchMessageW(msg_ref)
+
+                # 2. Run detection on keystrokes queued by the hook callback
+                self._drain_events()
+
+                # 3. Settle the zero-byte read once it signals (data or
+                # EOF), then drain the buffered IPC frames
+                if pending_read is not None and res == WAIT_OBJECT_0:
+                    try:
+                        pending_read.GetOverlappedResult(True)
+                    except OSError:
+                        pending_read = None
+                        break
+                    pending_read = None
+                    pipe_ready = True
+
+                if pipe_ready:
+                    exit_requested = self._drain_ipc()
+
+            # Settle any read still in flight before the connection (and
+            # its handle) can go away under it
+            if pending_read is not None:
+                pending_read.cancel()
+                try:
+                    pending_read.GetOverlappedResult(True)
+                except OSError:
+                    pass
+
+            if exit_requested:
+                return
+
+            # Connection lost: drop it and fall back to the reconnect loop
+            if self.conn:
+                try:
+                    self.conn.close()
+                except Exception:
+                    pass
+                self.conn = None
+
+            # The reconnect loop blocks without pumping messages, and a
+            # low-level hook whose thread stops pumping stalls every
+            # keystroke system-wide until Windows silently unhooks it —
+            # so the hook must come down first. The controller re-sends
+            # MSG_START once the connection is back.
+            self.stop_monitoring()
+
+    def _drain_ipc(self) -> bool:
+        """Handle every IPC frame currently buffered on the pipe.
+
+        Returns True when MSG_EXIT was received and the daemon should stop.
+        """
+        while self.conn and self.conn.poll(0):
+            try:
+                try:
+                    msg_ipc = decode_message(self.conn.recv_bytes())
+                except ValueError:
+                    # Malformed frame; drop it and keep the connection
+                    continue
+                if msg_ipc.type == MSG_START:
+                    self.start_monitoring()
+                elif msg_ipc.type == MSG_STOP:
+                    self.stop_monitoring()
+                elif msg_ipc.type == MSG_CONFIG:
+                    if msg_ipc.payload:
+                        self.detector.update_settings(
+                            threshold_ms=msg_ipc.payload.get("threshold", 30),
+                            history_size=msg_ipc.payload.get("history_size", 25),
+                            burst_keys=msg_ipc.payload.get("burst_keys", 10),
+                            burst_window_ms=msg_ipc.payload.get("burst_window_ms", 100),
+                            allow_auto_type=msg_ipc.payload.get("allow_auto_type", True)
+                        )
+                elif msg_ipc.type == MSG_EXIT:
+                    self.stop_monitoring()
+                    if self.conn:
+                        self.conn.close()
+                    return True
+            except (EOFError, Exception):
+                self.conn = None
+                self.stop_monitoring()
+                return False
+        return False
 
 
 if __name__ == "__main__":
@@ -2,14 +2,28 @@
 
 from __future__ import annotations
 
-import collections
+import array
 import time
-from typing import Deque
+
 
 class KeystrokeDetector:
     """Detects suspicious keystroke patterns."""
 
-    def __init__(self, threshold_ms: int = 30, history_size: int = 25, 
+    # Slot-based attributes: every keystroke touches several of these, and
+    # slot descriptors are faster to read than __dict__ lookups
+    __slots__ = (
+        "threshold_ms",
+        "history_size",
+        "burst_keys",
+        "burst_window_ms",
+        "allow_auto_type",
+        "_buf",
+        "_head",
+        "_count",
+        "_speed_total_threshold",
+    )
+
+    def __init__(self, threshold_ms: int = 30, history_size: int = 25,
                  burst_keys: int = 10, burst_window_ms: int = 100,
                  allow_auto_type: bool = True):
         """Initialize detector.
@@ -19,18 +33,32 @@ class KeystrokeDetector:
             history_size: Number of keystrokes to keep in history.
             burst_keys: Number of keys to trigger burst detection.
             burst_window_ms: Time window for burst detection in ms.
-            allow_auto_type: Whether to allow software-injected keys (placeholder for now).
+            allow_auto_type: Whether to allow software-injected keys
+                (consulted by the hook callback, which filters injected
+                keys before they reach the detector).
         """
         self.threshold_ms = threshold_ms
         self.history_size = history_size
         self.burst_keys = burst_keys
         self.burst_window_ms = burst_window_ms
         self.allow_auto_type = allow_auto_type
-        
-        # Stores timestamps of recent keystrokes
-        self._timestamps: Deque[float] = collections.deque(maxlen=history_size)
+        # avg interval < threshold  <=>  total span < threshold * (n - 1);
+        # precomputing the right side keeps division out of the per-key path
+        self._speed_total_threshold = threshold_ms * (history_size - 1)
+
+        # Fixed-size ring buffer of integer-ms timestamps: contiguous C int64s,
+        # no per-keystroke PyObject allocation, O(1) oldest/newest indexing.
+        self._buf = array.array('q', [0] * history_size)
+        self._head = 0   # next write slot; == oldest entry once full
+        self._count = 0  # filled entries, capped at history_size
 
-    def update_settings(self, threshold_ms: int, history_size: int, 
+    def _snapshot(self) -> list[int]:
+        """Return buffered timestamps ordered oldest to newest."""
+        if self._count < self.history_size:
+            return list(self._buf[: self._count])
+        return list(self._buf[self._head :]) + list(self._buf[: self._head])
+
+    def update_settings(self, threshold_ms: int, history_size: int,
                         burst_keys: int, burst_window_ms: int,
                         allow_auto_type: bool) -> None:
         """Update detection settings at runtime."""
@@ -38,59 +66,66 @@ class KeystrokeDetector:
         self.burst_keys = burst_keys
         self.burst_window_ms = burst_window_ms
         self.allow_auto_type = allow_auto_type
-        
+        self._speed_total_threshold = threshold_ms * (history_size - 1)
+
         # Resize history if needed
         if history_size != self.history_size:
+            # Rebuild the ring with the most recent entries preserved in order
+            ordered = self._snapshot()[-history_size:]
             self.history_size = history_size
-            # Create new deque with new size but keep existing items
-            new_deque: Deque[float] = collections.deque(self._timestamps, maxlen=history_size)
-            self._timestamps = new_deque
+            self._buf = array.array('q', [0] * history_size)
+            for i, ts in enumerate(ordered):
+                self._buf[i] = ts
+            self._count = len(ordered)
+            self._head = self._count % history_size
 
-    def process_keystroke(self, timestamp: float | None = None, is_injected: bool = False) -> bool:
+    def process_keystroke(self, timestamp: int | None = None) -> bool:
         """Process a keystroke and return True if suspicious.
-        
+
         Args:
-            timestamp: Time of keystroke (defaults to current time).
-            is_injected: Whether the keystroke was software-injected.
+            timestamp: Time of keystroke in ms (defaults to current time).
         """
-        if is_injected and self.allow_auto_type:
-            # Ignore software-injected keys if allowed (e.g. KeePass)
-            return False
-
         if timestamp is None:
-            timestamp = time.time() * 1000  # Convert to ms
-            
-        self._timestamps.append(timestamp)
-        
-        return self._check_speed() or self._check_burst()
-
-    def _check_speed(self) -> bool:
-        """Check if average typing speed is suspiciously fast."""
-        if len(self._timestamps) < self.history_size:
-            return False
-            
-        # Calculate average interval between keys
-        # We need at least 2 keys to have an interval
-        total_time = self._timestamps[-1] - self._timestamps[0]
-        avg_interval = total_time / (len(self._timestamps) - 1)
-        
-        return avg_interval < self.threshold_ms
-
-    def _check_burst(self) -> bool:
-        """Check for inhuman burst speeds."""
-        if len(self._timestamps) < self.burst_keys:
-            return False
-            
-        # Check time taken for the last N keys
-        # Get the Nth most recent timestamp (index -N)
-        # e.g. if burst_keys=10, we look at window from -10 to -1
-        burst_start_time = self._timestamps[-self.burst_keys]
-        burst_end_time = self._timestamps[-1]
-        
-        burst_duration = burst_end_time - burst_start_time
-        
-        return burst_duration < self.burst_window_ms
+            # Monotonic integer ms: immune to wall-clock jumps and keeps the
+            # interval arithmetic in ints
+            timestamp = time.perf_counter_ns() // 1_000_000
+
+        buf = self._buf
+        n = self.history_size
+        head = self._head
+        buf[head] = timestamp
+        head = (head + 1) % n
+        self._head = head
+        count = self._count
+        if count < n:
+            count += 1
+            self._count = count
+
+        # Speed and burst checks fused inline: the keystroke just written
+        # is the newest entry, and after the increment above `head` points
+        # at the oldest, so each check is one ring read and one compare.
+        # Hook timestamps are GetTickCount DWORDs that wrap every ~49.7
+        # days; masking each delta to 32 bits keeps it correct across a
+        # wrap instead of going hugely negative (which would satisfy the
+        # `<` and spuriously lock the workstation). The mask is a no-op
+        # for spans under the wrap period, so the 64-bit fallback stamps
+        # are unaffected.
+        # Speed: total span of a full window below threshold * (n - 1)
+        # is equivalent to the average interval being below threshold.
+        if count == n and \
+                (timestamp - buf[head]) & 0xFFFFFFFF < self._speed_total_threshold:
+            return True
+
+        # Burst: last burst_keys keys landed inside the burst window
+        burst_keys = self.burst_keys
+        if count >= burst_keys and \
+                (timestamp - buf[(head - burst_keys) % n]) & 0xFFFFFFFF \
+                < self.burst_window_ms:
+            return True
+
+        return False
 
     def reset(self) -> None:
         """Reset detection history."""
-        self._timestamps.clear()
+        self._head = 0
+        self._count = 0
@@ -21,6 +21,8 @@ class SettingsWindow:
         self.controller = controller # DuckHuntController (Protocol/Any to avoid circular import)
         self.root = root
         self._window: tk.Toplevel | None = None
+        # Resolved once; show() may run many times per session
+        self._icon_path = get_resource_path("resources/favicon.ico")
         
         # Current config values
         self.threshold = tk.IntVar(value=config.threshold)
@@ -53,11 +55,8 @@ class SettingsWindow:
         self._window.after(10, lambda: self._window.attributes("-topmost", False))
 
         # Set window icon
-        icon_path = get_resource_path("resources/favicon.ico")
-        if icon_path.exists():
-            self._window.iconbitmap(icon_path)
-        if icon_path.exists():
-            self._window.iconbitmap(icon_path)
+        if self._icon_path.exists():
+            self._window.iconbitmap(self._icon_path)
 
         # Layout - Bottom Buttons Frame first to ensure visibility
         btn_frame = ttk.Frame(self._window, padding=(10, 10, 10, 10))
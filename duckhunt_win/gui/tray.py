@@ -41,8 +41,7 @@ class DuckHuntTrayIcon:
         icon_path = get_resource_path("resources/favicon.ico")
         return Image.open(icon_path)
 
-    def start(self) -> None:
-        """Start the tray icon loop."""
+    def _build_icon(self) -> pystray.Icon:
         def get_state_label(item: Any) -> str:
             return "Stop Monitoring" if self.running_state else "Start Monitoring"
 
@@ -59,14 +58,27 @@ class DuckHuntTrayIcon:
             pystray.MenuItem("Exit", lambda: self._on_exit())
         )
 
-        self.icon = pystray.Icon(
+        return pystray.Icon(
             "DuckHunt",
             self.create_image(),
             "DuckHunt Protection",
             menu
         )
+
+    def start(self) -> None:
+        """Start the tray icon loop (blocks the calling thread)."""
+        self.icon = self._build_icon()
         self.icon.run()
 
+    def start_detached(self) -> None:
+        """Start the tray icon without blocking.
+
+        pystray manages its own loop internally, so the caller doesn't
+        need to dedicate a thread to start().
+        """
+        self.icon = self._build_icon()
+        self.icon.run_detached()
+
     def stop(self) -> None:
         """Stop the tray icon."""
         if self.icon:
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 
+import json
 from dataclasses import dataclass
 from typing import Any
 
@@ -14,20 +15,57 @@ MSG_DETECTED = "detected"
 MSG_CONFIG = "config"
 MSG_EXIT = "exit"
 
+# Wire format: one opcode byte followed by an optional JSON payload, carried
+# via Connection.send_bytes/recv_bytes. The fixed message schema doesn't need
+# pickle's object-graph walk (or its ability to instantiate arbitrary types)
+# on every send.
+_OPCODES = {
+    MSG_START: 0x01,
+    MSG_STOP: 0x02,
+    MSG_STATUS: 0x03,
+    MSG_DETECTED: 0x04,
+    MSG_CONFIG: 0x05,
+    MSG_EXIT: 0x06,
+}
+_TYPES = {opcode: type_ for type_, opcode in _OPCODES.items()}
+
+
+def encode_message(type: str, payload: dict[str, Any] | None = None) -> bytes:
+    """Encode a message into its wire frame."""
+    frame = bytes([_OPCODES[type]])
+    if payload:
+        frame += json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return frame
+
+
+def decode_message(frame: bytes) -> IPCMessage:
+    """Decode a wire frame into an IPCMessage.
+
+    Raises:
+        ValueError: If the frame is empty, has an unknown opcode, or
+            carries a malformed payload.
+    """
+    if not frame:
+        raise ValueError("empty IPC frame")
+    try:
+        type_ = _TYPES[frame[0]]
+    except KeyError:
+        raise ValueError(f"unknown IPC opcode: {frame[0]:#x}") from None
+    try:
+        payload = json.loads(frame[1:]) if len(frame) > 1 else None
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"malformed IPC payload: {exc}") from None
+    return IPCMessage(type_, payload)
+
 
 def get_ipc_address() -> str:
     """Get the IPC address (Named Pipe on Windows)."""
     return r"\\.\pipe\duckhunt_ipc"
 
 
-def get_window_ipc_address() -> str:
-    """Get the IPC address for the window/single-instance check."""
-    return r"\\.\pipe\duckhunt_window"
-
-
-@dataclass
+@dataclass(slots=True)
 class IPCMessage:
-    """Standard IPC message format."""
+    """Standard IPC message format (decoded form of a wire frame)."""
 
     type: str
     payload: dict[str, Any] | None = None
@@ -4,11 +4,14 @@ Utility functions for DuckHunt.
 from __future__ import annotations
 
 import ctypes
+import functools
 import os
 import sys
+from ctypes import wintypes
 from pathlib import Path
 
 
+@functools.lru_cache(maxsize=None)
 def get_resource_path(relative_path: str) -> Path:
     """
     Get absolute path to resource, works for dev and for PyInstaller.
@@ -38,50 +41,125 @@ def get_resource_path(relative_path: str) -> Path:
         
     return base_path / relative_path
 
-# Input Injection Detection
-# LLKHF_INJECTED = 0x00000010
-LLKHF_INJECTED = 0x10
+# Low-level keyboard hook types, defined once and shared (building a
+# ctypes Structure runs the layout machinery; no need to pay it twice)
+LLKHF_INJECTED = 0x00000010
+
 
 class KBDLLHOOKSTRUCT(ctypes.Structure):
     _fields_ = [
-        ("vkCode", ctypes.c_ulong),
-        ("scanCode", ctypes.c_ulong),
-        ("flags", ctypes.c_ulong),
-        ("time", ctypes.c_ulong),
-        ("dwExtraInfo", ctypes.POINTER(ctypes.c_ulong))
+        ("vkCode", wintypes.DWORD),
+        ("scanCode", wintypes.DWORD),
+        ("flags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", ctypes.POINTER(wintypes.ULONG))
     ]
 
 
 
+# Single-Instance Enforcement
+ERROR_ALREADY_EXISTS = 183
+
+def acquire_single_instance_mutex(name: str = r"Local\DuckHuntSingleInstance") -> int | None:
+    """Acquire the application's single-instance mutex.
+
+    Returns the mutex handle, which the caller must keep alive for the
+    process lifetime, or None if another instance already holds it.
+    A single CreateMutexW syscall replaces the old connect-and-fail
+    round trip against a dedicated named pipe.
+    """
+    # use_last_error captures the thread's last error at the ctypes call
+    # boundary; querying GetLastError afterwards can read a value already
+    # clobbered by ctypes' own machinery
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    handle = kernel32.CreateMutexW(None, True, name)
+    if handle and ctypes.get_last_error() == ERROR_ALREADY_EXISTS:
+        kernel32.CloseHandle(handle)
+        return None
+    return handle
+
+
 # Process Utilities
 PROCESS_QUERY_INFORMATION = 0x0400
+PROCESS_TERMINATE = 0x0001
 PROCESS_VM_READ = 0x0010
 SYNCHRONIZE = 0x00100000
 
+
+def create_process(cmdline: str, creationflags: int = 0) -> tuple[int, int]:
+    """Spawn a child process via _winapi.CreateProcess.
+
+    Skips subprocess.Popen's per-launch plumbing (STARTUPINFO setup,
+    handle-inheritance lists, the Popen object and its finalizer) on hot
+    relaunch paths. The child inherits our environment. Returns
+    (process_handle, pid); the caller owns the handle.
+    """
+    import _winapi
+
+    hproc, hthread, pid, _tid = _winapi.CreateProcess(
+        None, cmdline, None, None, False, creationflags, None, None, None
+    )
+    _winapi.CloseHandle(hthread)
+    return int(hproc), pid
+
+
+def terminate_pid(pid: int) -> bool:
+    """Forcefully terminate a process by PID.
+
+    Direct OpenProcess/TerminateProcess calls — two syscalls instead of
+    shelling out to taskkill.exe. Returns True if termination was issued.
+    """
+    if pid <= 0:
+        return False
+
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(PROCESS_TERMINATE, False, pid)
+    if not handle:
+        return False
+    try:
+        return bool(kernel32.TerminateProcess(handle, 1))
+    finally:
+        kernel32.CloseHandle(handle)
+
+STILL_ACTIVE = 259
+
+# Process handles held open across repeated liveness polls of the same PID
+_pid_handle_cache: dict[int, int] = {}
+
+
 def is_pid_running(pid: int) -> bool:
-    """Check if a process with the given PID is running."""
+    """Check if a process with the given PID is running.
+
+    The opened handle is cached per PID, so repeated polls pay a single
+    GetExitCodeProcess instead of an OpenProcess/CloseHandle pair each
+    time. Holding the handle also pins the PID against reuse while it is
+    being watched; it is closed and evicted as soon as the process is
+    seen dead.
+    """
     if pid <= 0:
         return False
-    
+
+    kernel32 = ctypes.windll.kernel32
     try:
-        # Open the process with specific rights
-        handle = ctypes.windll.kernel32.OpenProcess(
-            PROCESS_QUERY_INFORMATION | SYNCHRONIZE, 
-            False, 
-            pid
-        )
-        if not handle:
-            return False
+        handle = _pid_handle_cache.get(pid)
+        if handle is None:
+            handle = kernel32.OpenProcess(
+                PROCESS_QUERY_INFORMATION | SYNCHRONIZE,
+                False,
+                pid
+            )
+            if not handle:
+                return False
+            _pid_handle_cache[pid] = handle
 
         # Check exit code
         exit_code = ctypes.c_ulong()
-        if ctypes.windll.kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
-             # STILL_ACTIVE = 259
-            is_running = (exit_code.value == 259)
-            ctypes.windll.kernel32.CloseHandle(handle)
-            return is_running
-        
-        ctypes.windll.kernel32.CloseHandle(handle)
+        if (kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+                and exit_code.value == STILL_ACTIVE):
+            return True
+
+        _pid_handle_cache.pop(pid, None)
+        kernel32.CloseHandle(handle)
         return False
     except Exception:
         return False
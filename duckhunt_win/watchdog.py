@@ -10,12 +10,61 @@ import ctypes
 import os
 import subprocess
 import sys
-import time
+import threading
 import winreg
+from concurrent.futures import ThreadPoolExecutor
+from ctypes import wintypes
 from pathlib import Path
 from typing import NoReturn
 
-from duckhunt_win.utils import is_pid_running
+from duckhunt_win.utils import STILL_ACTIVE, SYNCHRONIZE, create_process
+
+kernel32 = ctypes.windll.kernel32
+
+INFINITE = 0xFFFFFFFF
+WAIT_OBJECT_0 = 0
+WAIT_TIMEOUT = 0x00000102
+WAIT_FAILED = 0xFFFFFFFF
+
+JOB_OBJECT_LIMIT_KILL_ON_JOB_CLOSE = 0x00002000
+JOB_OBJECT_LIMIT_SILENT_BREAKAWAY_OK = 0x00001000
+JobObjectExtendedLimitInformation = 9
+
+
+class _IO_COUNTERS(ctypes.Structure):
+    _fields_ = [
+        ("ReadOperationCount", ctypes.c_ulonglong),
+        ("WriteOperationCount", ctypes.c_ulonglong),
+        ("OtherOperationCount", ctypes.c_ulonglong),
+        ("ReadTransferCount", ctypes.c_ulonglong),
+        ("WriteTransferCount", ctypes.c_ulonglong),
+        ("OtherTransferCount", ctypes.c_ulonglong),
+    ]
+
+
+class _JOBOBJECT_BASIC_LIMIT_INFORMATION(ctypes.Structure):
+    _fields_ = [
+        ("PerProcessUserTimeLimit", wintypes.LARGE_INTEGER),
+        ("PerJobUserTimeLimit", wintypes.LARGE_INTEGER),
+        ("LimitFlags", wintypes.DWORD),
+        ("MinimumWorkingSetSize", ctypes.c_size_t),
+        ("MaximumWorkingSetSize", ctypes.c_size_t),
+        ("ActiveProcessLimit", wintypes.DWORD),
+        ("Affinity", ctypes.POINTER(wintypes.ULONG)),
+        ("PriorityClass", wintypes.DWORD),
+        ("SchedulingClass", wintypes.DWORD),
+    ]
+
+
+class _JOBOBJECT_EXTENDED_LIMIT_INFORMATION(ctypes.Structure):
+    _fields_ = [
+        ("BasicLimitInformation", _JOBOBJECT_BASIC_LIMIT_INFORMATION),
+        ("IoInfo", _IO_COUNTERS),
+        ("ProcessMemoryLimit", ctypes.c_size_t),
+        ("JobMemoryLimit", ctypes.c_size_t),
+        ("PeakProcessMemoryUsed", ctypes.c_size_t),
+        ("PeakJobMemoryUsed", ctypes.c_size_t),
+    ]
 
 
 class Watchdog:
@@ -24,68 +73,223 @@ class Watchdog:
     def __init__(self, parent_pid: int, auth_key: str) -> None:
         self.parent_pid = parent_pid
         self.auth_key = auth_key
-        # We assume responsibility for launching/restarting the daemon
-        self.daemon_process: subprocess.Popen[bytes] | None = None
+        # We assume responsibility for launching/restarting the daemon;
+        # the handle comes straight from CreateProcess and is waitable
+        self._daemon_handle: int | None = None
         self.controller_process_pid: int | None = parent_pid
-        
-        # State
-        self.should_exit = False
+        # SYNCHRONIZE handle on the controller; lets the kernel tell us
+        # when it exits instead of us polling its PID
+        self._controller_handle: int | None = None
 
-    def launch_daemon(self) -> None:
-        """Launch the Daemon process."""
-        env = os.environ.copy()
-        env["DUCKHUNT_AUTH_KEY"] = self.auth_key # Ensure it has the key
-        
+        # State: the Python Event for wait()/is_set() callers, mirrored by
+        # a manual-reset kernel event that can sit in the same
+        # WaitForMultipleObjects array as the child handles, so stop()
+        # wakes the main loop immediately instead of on the next tick
+        self.should_exit = threading.Event()
+        self._stop_event: int | None = (
+            kernel32.CreateEventW(None, True, False, None) or None
+        )
+
+        # Launch plumbing computed once: the command lines never change
+        # between restarts, and both children inherit our environment, so
+        # the auth key is exported here instead of copied per launch
+        os.environ["DUCKHUNT_AUTH_KEY"] = auth_key
         if getattr(sys, 'frozen', False):
-            cmd = [sys.executable, "--daemon"]
+            daemon_cmd = [sys.executable, "--daemon"]
+            controller_cmd = [
+                sys.executable,
+                "--auth-key", auth_key,
+                "--watchdog-pid", str(os.getpid()),
+            ]
         else:
-            cmd = [sys.executable, "-m", "duckhunt_win.daemon"]
+            daemon_cmd = [sys.executable, "-m", "duckhunt_win.daemon"]
+            controller_cmd = [
+                sys.executable, "-m", "duckhunt_win",
+                "--auth-key", auth_key,
+                "--watchdog-pid", str(os.getpid()),
+            ]
+        self._daemon_cmdline = subprocess.list2cmdline(daemon_cmd)
+        self._controller_cmdline = subprocess.list2cmdline(controller_cmd)
+        self._daemon_flags = (
+            subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+        )
+
+        # Kill-on-close job: the daemon is tied to this handle, so if the
+        # watchdog itself dies the kernel reaps it instead of leaving an
+        # orphaned keyboard hook behind. The controller stays out of the
+        # job — it is a supervisor peer that must survive watchdog death
+        # to run its own restart path.
+        self._job: int | None = self._create_job()
 
-        self.daemon_process = subprocess.Popen(
-            cmd,
-            env=env,
-            creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0,
+    def stop(self) -> None:
+        """Request a shutdown; wakes the main loop immediately."""
+        self.should_exit.set()
+        if self._stop_event:
+            kernel32.SetEvent(self._stop_event)
+
+    def _create_job(self) -> int | None:
+        """Create the kill-on-close job object for the spawned daemon."""
+        job = kernel32.CreateJobObjectW(None, None)
+        if not job:
+            return None
+        info = _JOBOBJECT_EXTENDED_LIMIT_INFORMATION()
+        info.BasicLimitInformation.LimitFlags = (
+            JOB_OBJECT_LIMIT_KILL_ON_JOB_CLOSE
+            | JOB_OBJECT_LIMIT_SILENT_BREAKAWAY_OK
+        )
+        ok = kernel32.SetInformationJobObject(
+            job,
+            JobObjectExtendedLimitInformation,
+            ctypes.byref(info),
+            ctypes.sizeof(info),
         )
+        if not ok:
+            kernel32.CloseHandle(job)
+            return None
+        return job
+
+    def _assign_to_job(self, process_handle: int) -> None:
+        """Tie a freshly spawned daemon to the kill-on-close job."""
+        if self._job:
+            kernel32.AssignProcessToJobObject(self._job, process_handle)
+
+    def launch_daemon(self) -> None:
+        """Launch the Daemon process."""
+        # Direct CreateProcess via the shared helper: no Popen object,
+        # STARTUPINFO plumbing or finalizer per restart
+        handle, _pid = create_process(self._daemon_cmdline, self._daemon_flags)
+        if self._daemon_handle:
+            kernel32.CloseHandle(self._daemon_handle)
+        self._daemon_handle = handle
+        self._assign_to_job(handle)
 
     def launch_controller(self) -> None:
         """Relaunch the Controller (GUI) process."""
         # Relaunch controller with the same Auth Key and our Watchdog PID
-        # so it knows it is being monitored.
-        env = os.environ.copy()
-        
-        cmd = []
-        if getattr(sys, 'frozen', False):
-            cmd = [sys.executable, "--auth-key", self.auth_key, "--watchdog-pid", str(os.getpid())]
-        else:
-            cmd = [sys.executable, "-m", "duckhunt_win", "--auth-key", self.auth_key, "--watchdog-pid", str(os.getpid())]
-            
-        proc = subprocess.Popen(cmd, env=env)
-        self.controller_process_pid = proc.pid
+        # so it knows it is being monitored. The handle CreateProcess
+        # returns is already waitable, so no OpenProcess round trip.
+        # Deliberately not assigned to the kill-on-close job: the
+        # controller supervises us right back (it restarts a dead
+        # watchdog), so it must outlive this process.
+        handle, pid = create_process(self._controller_cmdline)
+        if self._controller_handle:
+            kernel32.CloseHandle(self._controller_handle)
+        self._controller_handle = handle
+        self.controller_process_pid = pid
+
+    def _open_controller_handle(self) -> None:
+        """(Re)open a waitable handle on the current controller PID."""
+        if self._controller_handle:
+            kernel32.CloseHandle(self._controller_handle)
+            self._controller_handle = None
+        if self.controller_process_pid:
+            handle = kernel32.OpenProcess(
+                SYNCHRONIZE, False, self.controller_process_pid
+            )
+            self._controller_handle = handle or None
 
     def run(self) -> None:
         """Main loop."""
-        
+
         # 1. Start Daemon immediately
         self.launch_daemon()
-        
-        while not self.should_exit:
-            time.sleep(1.0)
-            
-            # Check Daemon
-            if self.daemon_process:
-                if self.daemon_process.poll() is not None:
+        self._open_controller_handle()
+
+        # Block in the kernel on the stop event and both child process
+        # handles; Windows wakes us the moment a child exits or stop() is
+        # called, so there is no poll tick and no shutdown latency.
+        while not self.should_exit.is_set():
+            if not self._daemon_handle:
+                self.launch_daemon()
+            if not self._controller_handle and self.controller_process_pid:
+                self._open_controller_handle()
+
+            handles = []
+            tags = []
+            if self._stop_event:
+                handles.append(self._stop_event)
+                tags.append("stop")
+            if self._daemon_handle:
+                handles.append(self._daemon_handle)
+                tags.append("daemon")
+            if self._controller_handle:
+                handles.append(self._controller_handle)
+                tags.append("controller")
+
+            if "daemon" not in tags and "controller" not in tags:
+                if self.should_exit.wait(1.0):
+                    break
+                continue
+
+            # With the stop event in the array the wait can be unbounded;
+            # keep a cap only when the event could not be created
+            timeout = INFINITE if self._stop_event else 1000
+
+            arr = (wintypes.HANDLE * len(handles))(*handles)
+            res = kernel32.WaitForMultipleObjects(len(handles), arr, False, timeout)
+
+            if res == WAIT_TIMEOUT:
+                continue
+            if WAIT_OBJECT_0 <= res < WAIT_OBJECT_0 + len(handles):
+                dead = tags[res - WAIT_OBJECT_0]
+                if dead == "stop":
+                    break
+                daemon_dead = dead == "daemon"
+                controller_dead = dead == "controller"
+                # The wait only reports the lowest signaled handle; check
+                # the sibling too so a joint failure (machine resume,
+                # session kill) restarts both without a second round trip
+                if daemon_dead and not self._handle_alive(self._controller_handle):
+                    controller_dead = True
+                if controller_dead and not self._handle_alive(self._daemon_handle):
+                    daemon_dead = True
+
+                if daemon_dead:
                     print("Watchdog: Daemon died. Restarting...")
-                    self.launch_daemon()
-            else:
-                 self.launch_daemon()
-            
-            # Check Controller
-            if self.controller_process_pid:
-                if not is_pid_running(self.controller_process_pid):
+                if controller_dead:
                     print("Watchdog: Controller died. Restarting...")
+                if daemon_dead and controller_dead:
+                    # Overlap the two CreateProcess calls (tens of ms each)
+                    # instead of serializing the recovery
+                    with ThreadPoolExecutor(max_workers=2) as executor:
+                        executor.submit(self.launch_daemon)
+                        executor.submit(self.launch_controller)
+                elif daemon_dead:
+                    self.launch_daemon()
+                elif controller_dead:
                     self.launch_controller()
             else:
-                self.launch_controller()
+                # WAIT_FAILED (e.g. a stale handle): resync with one round
+                # of the old per-child poll
+                self._poll_children()
+
+        if self._stop_event:
+            kernel32.CloseHandle(self._stop_event)
+            self._stop_event = None
+
+    def _handle_alive(self, handle: int | None) -> bool:
+        """Check a child via its cached handle: one GetExitCodeProcess
+        against a stable kernel object, immune to PID reuse."""
+        if not handle:
+            return False
+        exit_code = wintypes.DWORD()
+        ok = kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        return bool(ok) and exit_code.value == STILL_ACTIVE
+
+    def _poll_children(self) -> None:
+        """Fallback liveness poll used when the kernel wait fails."""
+        if self.should_exit.wait(1.0):
+            return
+
+        # Check Daemon
+        if not self._handle_alive(self._daemon_handle):
+            print("Watchdog: Daemon died. Restarting...")
+            self.launch_daemon()
+
+        # Check Controller
+        if not self._handle_alive(self._controller_handle):
+            print("Watchdog: Controller died. Restarting...")
+            self.launch_controller()
 
 def main() -> int:
     parser = argparse.ArgumentParser()
@@ -1,47 +1,67 @@
-import glob
 import os
+from concurrent.futures import ThreadPoolExecutor
+
 from PIL import Image
 
 def generate_icon():
-    # Source pattern
+    # Fixed prefix/suffix match; scandir's dirents carry the file type,
+    # so this is one directory read with no per-entry stat
     pattern = "duckhunt.*.png"
-    files = glob.glob(pattern)
-    
+    files = [
+        e.name
+        for e in os.scandir(".")
+        if e.is_file()
+        and e.name.startswith("duckhunt.")
+        and e.name.endswith(".png")
+    ]
+
     if not files:
         print(f"No files found matching {pattern}")
         return
 
     print(f"Found source images: {files}")
-    
-    images = []
+
+    # Pass 1: Image.open is lazy — it only parses the header, so we can
+    # read every file's dimensions without decoding a single pixel.
+    # Keep one source per size; the ICO holds one frame per size anyway.
+    by_size = {}
     for f in files:
         try:
             img = Image.open(f)
-            images.append(img)
-            print(f"Loaded {f} ({img.size})")
         except Exception as e:
             print(f"Failed to load {f}: {e}")
+            continue
+        print(f"Found {f} ({img.size})")
+        if img.size in by_size:
+            img.close()
+        else:
+            by_size[img.size] = img
 
-    if not images:
+    if not by_size:
         print("No valid images to create icon.")
         return
 
-    # Sort images by size (largest first usually preferred for high quality, but ICO dict handles it)
-    # Actually for .save(append_images=...), the first image is the primary one, others are appended.
-    # Usually largest first is best practice for the main view.
-    images.sort(key=lambda i: i.size[0], reverse=True)
-    
+    # Pass 2: decode the survivors, in parallel — libpng releases the
+    # GIL, so the per-file decodes genuinely overlap. Every source is
+    # needed: append_images below supplies the hand-authored art for its
+    # exact sizes instead of a resampled downscale of the master.
+    images = sorted(by_size.values(), key=lambda i: i.size[0], reverse=True)
+    with ThreadPoolExecutor(max_workers=min(8, len(images))) as executor:
+        list(executor.map(Image.Image.load, images))
+
     output_path = "duckhunt_win/resources/favicon.ico"
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
     print(f"Saving icon to {output_path}...")
     try:
-        # Save the first image as ICO, appending the rest
+        # append_images replaces the scaled-down frames with the
+        # hand-sized sources where one exists; Pillow downscales the
+        # primary only for sizes without their own art
         images[0].save(
-            output_path, 
-            format='ICO', 
-            sizes=[(img.width, img.height) for img in images],
-            append_images=images[1:]
+            output_path,
+            format='ICO',
+            sizes=[img.size for img in images],
+            append_images=images[1:],
         )
         print("Icon generation successful.")
     except Exception as e:
@@ -1,4 +1,9 @@
-VSVersionInfo(
+"""Renders the PyInstaller version-info resource for build_exe.py."""
+
+
+def render(file_version_tuple: tuple, file_version_str: str) -> str:
+    """Render the VSVersionInfo block for the given version."""
+    return f"""VSVersionInfo(
   ffi=FixedFileInfo(
     filevers={file_version_tuple},
     prodvers={file_version_tuple},
@@ -26,3 +31,4 @@ VSVersionInfo(
     VarFileInfo([VarStruct(u'Translation', [1033, 1200])])
   ]
 )
+"""